@@ -13,11 +13,13 @@ import requests
 from datetime import datetime
 from typing import Optional
 
-# 飞书通知
+from notifier_common import CheckinResult
+
+# 通知分发（钉钉 / 飞书并发发送）
 try:
-    from feishu_notifier import send_checkin_notification
+    from notifier_dispatch import dispatch_all
 except ImportError:
-    send_checkin_notification = None
+    dispatch_all = None
 
 
 class NewAPICheckin:
@@ -416,26 +418,24 @@ def main():
                     total_str = str(total_quota)
                 print(f'  统计: 本月已签 {checkin_count} 天，累计 {total_str} 额度')
 
-            # 收集结果用于钉钉通知
-            account_result = {
-                'name': name,
-                'success': True,
-                'message': result['message'],
-                'quota_awarded': result.get('quota_awarded'),
-                'checkin_count': checkin_count
-            }
-            checkin_results.append(account_result)
+            # 收集结果用于通知（slots 数据类，字段访问无需哈希查找）
+            checkin_results.append(CheckinResult(
+                name=name,
+                success=True,
+                message=result['message'],
+                quota_awarded=result.get('quota_awarded') or 0,
+                checkin_count=checkin_count
+            ))
         else:
             fail_count += 1
             print(f'  结果: ❌ {result["message"]}')
-            # 收集失败结果用于钉钉通知
-            account_result = {
-                'name': name,
-                'success': False,
-                'message': result['message'],
-                'session_expired': 'session' in result['message'].lower() or '认证' in result['message']
-            }
-            checkin_results.append(account_result)
+            # 收集失败结果用于通知
+            checkin_results.append(CheckinResult(
+                name=name,
+                success=False,
+                message=result['message'],
+                session_expired='session' in result['message'].lower() or '认证' in result['message']
+            ))
 
         print()
 
@@ -444,12 +444,12 @@ def main():
     print(f'签到完成: 成功 {success_count}, 失败 {fail_count}')
     print('=' * 50)
     
-    # 发送飞书通知
-    if send_checkin_notification:
-        print('正在发送飞书通知...')
-        send_checkin_notification(checkin_results, execution_time)
-    elif os.environ.get('FEISHU_WEBHOOK'):
-        print('[警告] 已配置 FEISHU_WEBHOOK 但无法导入通知模块')
+    # 并发发送通知到所有已配置的渠道
+    if dispatch_all:
+        print('正在发送通知...')
+        dispatch_all(checkin_results, execution_time)
+    elif os.environ.get('FEISHU_WEBHOOK') or os.environ.get('DINGTALK_WEBHOOK'):
+        print('[警告] 已配置通知 Webhook 但无法导入通知模块')
 
     # 如果全部失败则返回错误码
     if fail_count == len(accounts):
@@ -5,19 +5,53 @@
 """
 
 import hmac
-import hashlib
 import base64
+import io
 import time
 import urllib.parse
 import json
 import os
-from datetime import datetime
 from typing import Optional, List, Dict, Any
 
+from notifier_common import CheckinResult, ResultLike, classify_results, format_quota
+
+__all__ = ['DingTalkNotifier', 'build_checkin_report', 'send_checkin_notification', 'format_quota']
+
+# 复用带连接池的 Session，批量发送时省掉每条消息的 TCP+TLS 握手；
+# requests 及其依赖链（urllib3/certifi 等）到首次发送时才导入，
+# 未触发通知的运行不付几十毫秒的导入成本
+_SESSION = None
+
+
+def _get_session():
+    """懒加载 requests 并返回模块级连接池 Session"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        _SESSION = requests.Session()
+        _SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return _SESSION
+
+
+_HEADERS = {'Content-Type': 'application/json'}
+
+# 成功行超过该数时放弃表格改用紧凑列表；失败行超过该数时折叠余下部分。
+# 钉钉 Markdown 消息上限 20KB，账号多时表格会逼近并触发服务端拒收
+_COMPACT_THRESHOLD = 20
+
+# 报告的静态片段只在模块加载时构造一次
+_REPORT_HEADER_TMPL = '# 📋 NewAPI 签到报告\n\n**执行时间**: {t}\n\n---\n\n'
+_SUCCESS_TABLE_HEAD = '| 账号 | 奖励 | 详情 |\n|------|------|------|\n'
+_FAIL_TABLE_HEAD = '| 账号 | 原因 |\n|------|------|\n'
+_EXPIRED_NOTICE = '\n\n> ⚠️ **注意**: 部分账号 Session 已失效，请及时更新 Cookie！'
+
+# 优先使用 orjson（直接输出 UTF-8 bytes，序列化快 2-5 倍），未安装则回退到标准库
 try:
-    import requests
+    import orjson
+    _dumps = orjson.dumps
 except ImportError:
-    requests = None
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
 
 class DingTalkNotifier:
@@ -33,20 +67,33 @@ class DingTalkNotifier:
         """
         self.webhook_url = webhook_url
         self.secret = secret
-    
+        # 密钥编码一次即可，避免每次签名重复 encode；
+        # 待签串里密钥部分固定，预拼成 bytes 后缀，签名时只需编码时间戳
+        self._secret_enc = secret.encode('utf-8') if secret else None
+        self._sign_suffix = b'\n' + self._secret_enc if secret else None
+        # 签名缓存: (时间桶, timestamp, sign)，钉钉签名有效期 1 小时，
+        # 按 30 分钟分桶缓存，批量发送时复用同一签名
+        self._sign_cache = None
+
     def _get_sign(self) -> tuple:
         """
-        生成签名
-        
+        生成签名（同一时间桶内复用缓存结果）
+
         Returns:
             (timestamp, sign) 元组
         """
+        bucket = int(time.time()) // 1800
+        cached = self._sign_cache
+        if cached and cached[0] == bucket:
+            return cached[1], cached[2]
+
         timestamp = str(round(time.time() * 1000))
-        secret_enc = self.secret.encode('utf-8')
-        string_to_sign = f'{timestamp}\n{self.secret}'
-        string_to_sign_enc = string_to_sign.encode('utf-8')
-        hmac_code = hmac.new(secret_enc, string_to_sign_enc, digestmod=hashlib.sha256).digest()
+        # 时间戳是纯 ASCII 数字，直接 encode 后拼上预编码的密钥后缀
+        string_to_sign_enc = timestamp.encode('ascii') + self._sign_suffix
+        # hmac.digest + 'sha256' 走 OpenSSL 一次性 C 路径，比 hmac.new 快数倍
+        hmac_code = hmac.digest(self._secret_enc, string_to_sign_enc, 'sha256')
         sign = urllib.parse.quote_plus(base64.b64encode(hmac_code))
+        self._sign_cache = (bucket, timestamp, sign)
         return timestamp, sign
     
     def _get_url(self) -> str:
@@ -73,10 +120,6 @@ class DingTalkNotifier:
         Returns:
             是否发送成功
         """
-        if requests is None:
-            print('[钉钉通知] 错误: 未安装 requests 库')
-            return False
-            
         data = {
             'msgtype': 'text',
             'text': {
@@ -102,10 +145,6 @@ class DingTalkNotifier:
         Returns:
             是否发送成功
         """
-        if requests is None:
-            print('[钉钉通知] 错误: 未安装 requests 库')
-            return False
-            
         data = {
             'msgtype': 'markdown',
             'markdown': {
@@ -129,12 +168,25 @@ class DingTalkNotifier:
         Returns:
             是否发送成功
         """
+        try:
+            session = _get_session()
+        except ImportError:
+            print('[钉钉通知] 错误: 未安装 requests 库')
+            return False
+
         try:
             url = self._get_url()
-            headers = {'Content-Type': 'application/json'}
-            response = requests.post(url, headers=headers, data=json.dumps(data), timeout=10)
+            response = session.post(url, headers=_HEADERS, data=_dumps(data), timeout=10)
+
+            # 非 200 时响应体可能是 HTML 错误页，不做 JSON 解析，直接报状态码；
+            # close 让连接立即归还池子，保持 keep-alive
+            if response.status_code != 200:
+                print(f'[钉钉通知] 发送失败: HTTP {response.status_code}')
+                response.close()
+                return False
+
             result = response.json()
-            
+
             if result.get('errcode') == 0:
                 print('[钉钉通知] 消息发送成功')
                 return True
@@ -146,112 +198,85 @@ class DingTalkNotifier:
             return False
 
 
-def format_quota(quota: int) -> str:
-    """
-    格式化额度显示
-    
-    Args:
-        quota: 额度数值
-        
-    Returns:
-        格式化后的字符串
-    """
-    if quota >= 1000000:
-        return f'{quota / 1000000:.2f}M'
-    elif quota >= 1000:
-        return f'{quota / 1000:.2f}K'
-    else:
-        return str(quota)
-
-
-def build_checkin_report(results: List[Dict[str, Any]], execution_time: str) -> str:
+def build_checkin_report(results: List[ResultLike], execution_time: str,
+                         classified: Optional[tuple] = None) -> str:
     """
     构建签到报告 Markdown 内容
-    
+
     Args:
-        results: 签到结果列表，每个结果包含:
-            - name: 账号名称
-            - success: 是否成功
-            - message: 结果消息
-            - quota_awarded: 获得的额度（可选）
-            - checkin_count: 本月签到天数（可选）
-            - session_expired: 是否 session 失效（可选）
+        results: 签到结果列表（CheckinResult 或等价字段的 dict）
         execution_time: 执行时间字符串
-        
+        classified: 可选的 classify_results 结果，调用方已分类时传入避免重复遍历
+
     Returns:
         Markdown 格式的报告内容
     """
-    success_list = [r for r in results if r.get('success')]
-    fail_list = [r for r in results if not r.get('success')]
-    
+    success_list, fail_list, expired_list = classified or classify_results(results)
+
+    # 用 StringIO 流式写入单个缓冲区，省掉 append 扩容和最终 join 的整体拷贝；
+    # write 绑定到局部变量，行循环里少一次属性查找
+    buf = io.StringIO()
+    write = buf.write
+
     # 标题
-    lines = [
-        '# 📋 NewAPI 签到报告',
-        '',
-        f'**执行时间**: {execution_time}',
-        '',
-        '---',
-        ''
-    ]
-    
+    write(_REPORT_HEADER_TMPL.format(t=execution_time))
+
     # 成功列表
     if success_list:
-        lines.append(f'## ✅ 成功 ({len(success_list)}个)')
-        lines.append('')
-        lines.append('| 账号 | 奖励 | 详情 |')
-        lines.append('|------|------|------|')
-        for r in success_list:
-            name = r.get('name', '未知账号')
-            quota = r.get('quota_awarded', 0)
-            quota_str = f'+{format_quota(quota)}' if quota else '-'
-            checkin_count = r.get('checkin_count')
-            detail = f'已签 {checkin_count} 天' if checkin_count else r.get('message', '成功')
-            lines.append(f'| {name} | {quota_str} | {detail} |')
-        lines.append('')
-    
-    # 失败列表
+        write(f'## ✅ 成功 ({len(success_list)}个)\n\n')
+        if len(success_list) > _COMPACT_THRESHOLD:
+            # 大列表改用紧凑项目符号，生成器 + join 在 C 层拼接
+            write(''.join(
+                f'- {r.name}（{"+" + format_quota(r.quota_awarded) if r.quota_awarded else "-"}，'
+                f'{f"已签 {r.checkin_count} 天" if r.checkin_count else (r.message or "成功")}）\n'
+                for r in success_list
+            ))
+        else:
+            write(_SUCCESS_TABLE_HEAD)
+            for r in success_list:
+                quota_str = f'+{format_quota(r.quota_awarded)}' if r.quota_awarded else '-'
+                detail = f'已签 {r.checkin_count} 天' if r.checkin_count else (r.message or '成功')
+                write(f'| {r.name} | {quota_str} | {detail} |\n')
+        write('\n')
+
+    # 失败列表（超出上限的部分折叠，失败原因通常高度重复）
     if fail_list:
-        lines.append(f'## ❌ 失败 ({len(fail_list)}个)')
-        lines.append('')
-        lines.append('| 账号 | 原因 |')
-        lines.append('|------|------|')
-        for r in fail_list:
-            name = r.get('name', '未知账号')
-            message = r.get('message', '未知错误')
-            # 标注 session 失效
-            if r.get('session_expired') or 'session' in message.lower() or '认证' in message or '过期' in message:
+        expired_ids = {id(r) for r in expired_list}
+        write(f'## ❌ 失败 ({len(fail_list)}个)\n\n')
+        write(_FAIL_TABLE_HEAD)
+        for r in fail_list[:_COMPACT_THRESHOLD]:
+            message = r.message or '未知错误'
+            # 标注 session 失效（分类时已判定一次，这里只查集合）
+            if id(r) in expired_ids:
                 message = f'⚠️ {message}'
-            lines.append(f'| {name} | {message} |')
-        lines.append('')
-    
+            write(f'| {r.name} | {message} |\n')
+        hidden = len(fail_list) - _COMPACT_THRESHOLD
+        if hidden > 0:
+            write(f'| … | 另有 {hidden} 个失败账号未列出 |\n')
+        write('\n')
+
     # 汇总
-    lines.append('---')
-    lines.append('')
-    
+    write('---\n\n')
+
     total = len(results)
     success_count = len(success_list)
     fail_count = len(fail_list)
-    
+
     if fail_count == 0:
-        lines.append(f'**汇总**: 全部成功 ✨ ({success_count}/{total})')
+        write(f'**汇总**: 全部成功 ✨ ({success_count}/{total})')
     elif success_count == 0:
-        lines.append(f'**汇总**: 全部失败 ⚠️ ({fail_count}/{total})')
+        write(f'**汇总**: 全部失败 ⚠️ ({fail_count}/{total})')
     else:
-        lines.append(f'**汇总**: 成功 {success_count}，失败 {fail_count}')
-    
+        write(f'**汇总**: 成功 {success_count}，失败 {fail_count}')
+
     # 如果有 session 失效的账号，添加提醒
-    expired_accounts = [r for r in fail_list if r.get('session_expired') or 
-                       'session' in r.get('message', '').lower() or 
-                       '认证' in r.get('message', '') or 
-                       '过期' in r.get('message', '')]
-    if expired_accounts:
-        lines.append('')
-        lines.append('> ⚠️ **注意**: 部分账号 Session 已失效，请及时更新 Cookie！')
-    
-    return '\n'.join(lines)
+    if expired_list:
+        write(_EXPIRED_NOTICE)
 
+    return buf.getvalue()
 
-def send_checkin_notification(results: List[Dict[str, Any]], execution_time: Optional[str] = None) -> bool:
+
+def send_checkin_notification(results: List[ResultLike], execution_time: Optional[str] = None) -> bool:
     """
     发送签到通知到钉钉
     
@@ -262,6 +287,11 @@ def send_checkin_notification(results: List[Dict[str, Any]], execution_time: Opt
     Returns:
         是否发送成功
     """
+    # 空结果直接跳过，省掉构建、签名和整个网络往返
+    if not results:
+        print('[钉钉通知] 签到结果为空，跳过通知')
+        return True
+
     # 从环境变量获取配置
     webhook_url = os.environ.get('DINGTALK_WEBHOOK', '')
     secret = os.environ.get('DINGTALK_SECRET', '')
@@ -272,15 +302,17 @@ def send_checkin_notification(results: List[Dict[str, Any]], execution_time: Opt
     
     # 默认执行时间
     if not execution_time:
-        execution_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    # 构建报告
-    report = build_checkin_report(results, execution_time)
+        execution_time = time.strftime('%Y-%m-%d %H:%M:%S')
     
+    # 分类一次，报告和标题共用，避免重复遍历
+    classified = classify_results(results)
+    report = build_checkin_report(results, execution_time, classified)
+
     # 生成标题（用于消息列表预览）
-    success_count = len([r for r in results if r.get('success')])
-    fail_count = len([r for r in results if not r.get('success')])
-    
+    success_count = len(classified[0])
+    fail_count = len(classified[1])
+
+
     if fail_count == 0:
         title = f'✅ 签到成功 ({success_count}个账号)'
     elif success_count == 0:
@@ -297,30 +329,16 @@ def send_checkin_notification(results: List[Dict[str, Any]], execution_time: Opt
 if __name__ == '__main__':
     # 测试数据
     test_results = [
-        {
-            'name': '主力站',
-            'success': True,
-            'message': '签到成功',
-            'quota_awarded': 500000,
-            'checkin_count': 15
-        },
-        {
-            'name': '备用站',
-            'success': True,
-            'message': '签到成功',
-            'quota_awarded': 100000,
-            'checkin_count': 8
-        },
-        {
-            'name': '测试站',
-            'success': False,
-            'message': 'Session 已过期',
-            'session_expired': True
-        }
+        CheckinResult(name='主力站', success=True, message='签到成功',
+                      quota_awarded=500000, checkin_count=15),
+        CheckinResult(name='备用站', success=True, message='签到成功',
+                      quota_awarded=100000, checkin_count=8),
+        CheckinResult(name='测试站', success=False, message='Session 已过期',
+                      session_expired=True),
     ]
     
     # 打印预览
-    report = build_checkin_report(test_results, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    report = build_checkin_report(test_results, time.strftime('%Y-%m-%d %H:%M:%S'))
     print('=== 消息预览 ===')
     print(report)
     print('================')
@@ -5,18 +5,46 @@
 """
 
 import base64
-import hashlib
 import hmac
 import json
 import os
 import time
-from datetime import datetime
 from typing import Optional, List, Dict, Any
 
+from notifier_common import ResultLike, classify_results, format_quota
+
+__all__ = ['FeishuNotifier', 'build_checkin_card', 'send_checkin_notification', 'format_quota']
+
+# 复用带连接池的 Session，批量发送时省掉每条消息的 TCP+TLS 握手；
+# requests 及其依赖链（urllib3/certifi 等）到首次发送时才导入，
+# 未触发通知的运行不付几十毫秒的导入成本
+_SESSION = None
+
+
+def _get_session():
+    """懒加载 requests 并返回模块级连接池 Session"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        _SESSION = requests.Session()
+        _SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return _SESSION
+
+
+_HEADERS = {'Content-Type': 'application/json'}
+
+# 卡片的只读静态片段在模块加载时构造一次，构建时直接引用同一对象
+# （发送路径只序列化不修改，跨调用共享是安全的）
+_CARD_CONFIG = {'wide_screen_mode': True}
+_HR = {'tag': 'hr'}
+
+# 优先使用 orjson（直接输出 UTF-8 bytes，序列化快 2-5 倍），未安装则回退到标准库
 try:
-    import requests
+    import orjson
+    _dumps = orjson.dumps
 except ImportError:
-    requests = None
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
 
 class FeishuNotifier:
@@ -25,27 +53,33 @@ class FeishuNotifier:
     def __init__(self, webhook_url: str, secret: Optional[str] = None):
         self.webhook_url = webhook_url
         self.secret = secret
+        # 密钥编码一次即可，避免每次签名重复 encode；
+        # 待签串里密钥部分固定，预拼成 bytes 后缀，签名时只需编码时间戳
+        self._secret_enc = secret.encode('utf-8') if secret else None
+        self._sign_suffix = b'\n' + self._secret_enc if secret else None
+        # 签名缓存: (秒级时间戳, timestamp, sign)，同一秒内批量发送复用签名
+        self._sign_cache = None
 
     def _build_auth_fields(self) -> Dict[str, str]:
-        """生成飞书签名字段（可选）"""
+        """生成飞书签名字段（可选，同一秒内复用缓存结果）"""
         if not self.secret:
             return {}
-        timestamp = str(int(time.time()))
-        string_to_sign = f'{timestamp}\n{self.secret}'
-        hmac_code = hmac.new(
-            self.secret.encode('utf-8'),
-            string_to_sign.encode('utf-8'),
-            digestmod=hashlib.sha256
-        ).digest()
+        now = int(time.time())
+        cached = self._sign_cache
+        if cached and cached[0] == now:
+            return {'timestamp': cached[1], 'sign': cached[2]}
+
+        timestamp = str(now)
+        # 时间戳是纯 ASCII 数字，直接 encode 后拼上预编码的密钥后缀
+        string_to_sign_enc = timestamp.encode('ascii') + self._sign_suffix
+        # hmac.digest + 'sha256' 走 OpenSSL 一次性 C 路径，比 hmac.new 快数倍
+        hmac_code = hmac.digest(self._secret_enc, string_to_sign_enc, 'sha256')
         sign = base64.b64encode(hmac_code).decode('utf-8')
+        self._sign_cache = (now, timestamp, sign)
         return {'timestamp': timestamp, 'sign': sign}
 
     def send_text(self, content: str) -> bool:
         """发送文本消息"""
-        if requests is None:
-            print('[飞书通知] 错误: 未安装 requests 库')
-            return False
-
         data = {
             'msg_type': 'text',
             'content': {'text': content}
@@ -55,10 +89,6 @@ class FeishuNotifier:
 
     def send_interactive_card(self, card: Dict[str, Any]) -> bool:
         """发送交互卡片消息"""
-        if requests is None:
-            print('[飞书通知] 错误: 未安装 requests 库')
-            return False
-
         data: Dict[str, Any] = {
             'msg_type': 'interactive',
             'card': card
@@ -68,8 +98,21 @@ class FeishuNotifier:
 
     def _send(self, data: dict) -> bool:
         try:
-            headers = {'Content-Type': 'application/json'}
-            response = requests.post(self.webhook_url, headers=headers, data=json.dumps(data), timeout=10)
+            session = _get_session()
+        except ImportError:
+            print('[飞书通知] 错误: 未安装 requests 库')
+            return False
+
+        try:
+            response = session.post(self.webhook_url, headers=_HEADERS, data=_dumps(data), timeout=10)
+
+            # 非 200 时响应体可能是 HTML 错误页，不做 JSON 解析，直接报状态码；
+            # close 让连接立即归还池子，保持 keep-alive
+            if response.status_code != 200:
+                print(f'[飞书通知] 发送失败: HTTP {response.status_code}')
+                response.close()
+                return False
+
             result = response.json()
             if result.get('code') == 0:
                 print('[飞书通知] 消息发送成功')
@@ -81,14 +124,6 @@ class FeishuNotifier:
             return False
 
 
-def format_quota(quota: int) -> str:
-    if quota >= 1000000:
-        return f'{quota / 1000000:.2f}M'
-    if quota >= 1000:
-        return f'{quota / 1000:.2f}K'
-    return str(quota)
-
-
 def _build_summary_title(success_count: int, fail_count: int) -> str:
     if fail_count == 0:
         return f'签到完成: 全部成功 ({success_count})'
@@ -105,14 +140,14 @@ def _build_header_template(success_count: int, fail_count: int) -> str:
     return 'orange'
 
 
-def build_checkin_card(results: List[Dict[str, Any]], execution_time: str) -> Dict[str, Any]:
-    success_list = [r for r in results if r.get('success')]
-    fail_list = [r for r in results if not r.get('success')]
+def build_checkin_card(results: List[ResultLike], execution_time: str) -> Dict[str, Any]:
+    # 单次遍历完成成功/失败分组（与钉钉共用同一分类逻辑）
+    success_list, fail_list, _ = classify_results(results)
     success_count = len(success_list)
     fail_count = len(fail_list)
 
     card: Dict[str, Any] = {
-        'config': {'wide_screen_mode': True},
+        'config': _CARD_CONFIG,
         'header': {
             'template': _build_header_template(success_count, fail_count),
             'title': {
@@ -125,31 +160,29 @@ def build_checkin_card(results: List[Dict[str, Any]], execution_time: str) -> Di
                 'tag': 'markdown',
                 'content': f'**执行时间**: {execution_time}\n**账号总数**: {len(results)}'
             },
-            {'tag': 'hr'}
+            _HR
         ]
     }
 
+    # 行列表用推导式一次建好（单次分配），字段走 slots 属性访问
     if success_list:
-        success_lines = [f'✅ **成功 {success_count} 个**']
-        for r in success_list:
-            name = r.get('name', '未知账号')
-            quota = r.get('quota_awarded', 0)
-            checkin_count = r.get('checkin_count', 0)
-            quota_text = f'+{format_quota(quota)}' if quota else '-'
-            success_lines.append(f'- `{name}` | 奖励: `{quota_text}` | 本月: `{checkin_count}` 天')
+        success_lines = [f'✅ **成功 {success_count} 个**'] + [
+            f'- `{r.name}` | 奖励: `{"+" + format_quota(r.quota_awarded) if r.quota_awarded else "-"}` | '
+            f'本月: `{r.checkin_count}` 天'
+            for r in success_list
+        ]
         card['elements'].append({'tag': 'markdown', 'content': '\n'.join(success_lines)})
 
     if fail_list:
         if success_list:
-            card['elements'].append({'tag': 'hr'})
-        fail_lines = [f'❌ **失败 {fail_count} 个**']
-        for r in fail_list:
-            name = r.get('name', '未知账号')
-            message = r.get('message', '未知错误')
-            fail_lines.append(f'- `{name}` | 原因: {message}')
+            card['elements'].append(_HR)
+        fail_lines = [f'❌ **失败 {fail_count} 个**'] + [
+            f'- `{r.name}` | 原因: {r.message or "未知错误"}'
+            for r in fail_list
+        ]
         card['elements'].append({'tag': 'markdown', 'content': '\n'.join(fail_lines)})
 
-    card['elements'].append({'tag': 'hr'})
+    card['elements'].append(_HR)
     card['elements'].append({
         'tag': 'note',
         'elements': [{
@@ -160,7 +193,12 @@ def build_checkin_card(results: List[Dict[str, Any]], execution_time: str) -> Di
     return card
 
 
-def send_checkin_notification(results: List[Dict[str, Any]], execution_time: Optional[str] = None) -> bool:
+def send_checkin_notification(results: List[ResultLike], execution_time: Optional[str] = None) -> bool:
+    # 空结果直接跳过，省掉构建、签名和整个网络往返
+    if not results:
+        print('[飞书通知] 签到结果为空，跳过通知')
+        return True
+
     webhook_url = os.environ.get('FEISHU_WEBHOOK', '')
     secret = os.environ.get('FEISHU_SECRET', '')
 
@@ -169,7 +207,7 @@ def send_checkin_notification(results: List[Dict[str, Any]], execution_time: Opt
         return False
 
     if not execution_time:
-        execution_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        execution_time = time.strftime('%Y-%m-%d %H:%M:%S')
 
     notifier = FeishuNotifier(webhook_url, secret if secret else None)
     card = build_checkin_card(results, execution_time)
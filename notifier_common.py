@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+通知公共模块
+钉钉 / 飞书通知共用的结果类型、额度格式化与结果分类逻辑，只编译加载一份
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Union
+
+__all__ = ['CheckinResult', 'ResultLike', 'EXPIRED_RE', 'format_quota', 'classify_results']
+
+# Session 失效特征，预编译一次，比逐条 lower() + 多次 in 扫描快
+EXPIRED_RE = re.compile(r'session|认证|过期', re.IGNORECASE)
+
+
+@dataclass(slots=True, frozen=True)
+class CheckinResult:
+    """
+    单个账号的签到结果
+
+    slots 布局让字段访问变成固定偏移读取而非哈希查找，
+    每行内存占用也比 dict 小得多
+    """
+    name: str = '未知账号'
+    success: bool = False
+    message: str = ''
+    quota_awarded: int = 0
+    checkin_count: int = 0
+    session_expired: bool = False
+
+    @classmethod
+    def from_mapping(cls, r: Dict[str, Any]) -> 'CheckinResult':
+        """从旧的 dict 结果行构造（兼容外部调用方）"""
+        return cls(
+            name=r.get('name') or '未知账号',
+            success=bool(r.get('success')),
+            message=r.get('message') or '',
+            quota_awarded=r.get('quota_awarded') or 0,
+            checkin_count=r.get('checkin_count') or 0,
+            session_expired=bool(r.get('session_expired')),
+        )
+
+
+# 结果行：推荐直接构造 CheckinResult，dict 仍然兼容（分类时统一转换）
+ResultLike = Union[CheckinResult, Dict[str, Any]]
+
+
+def format_quota(quota: int) -> str:
+    """
+    格式化额度显示（实际数据以 >=1M 为主，热路径放最前）
+
+    Args:
+        quota: 额度数值
+
+    Returns:
+        格式化后的字符串
+    """
+    return (f'{quota / 1_000_000:.2f}M' if quota >= 1_000_000
+            else f'{quota / 1_000:.2f}K' if quota >= 1_000
+            else str(quota))
+
+
+def classify_results(results: List[ResultLike]) -> tuple:
+    """
+    单次遍历把签到结果分为成功 / 失败 / Session 失效三组
+
+    dict 结果行在这里统一转换成 CheckinResult，
+    后续构建循环全部走 slots 属性访问
+
+    Args:
+        results: 签到结果列表
+
+    Returns:
+        (success_list, fail_list, expired_list) 元组，
+        expired_list 是 fail_list 中 Session 失效账号的子集
+    """
+    success_list = []
+    fail_list = []
+    expired_list = []
+    for r in results:
+        if not isinstance(r, CheckinResult):
+            r = CheckinResult.from_mapping(r)
+        if r.success:
+            success_list.append(r)
+            continue
+        fail_list.append(r)
+        if r.session_expired or EXPIRED_RE.search(r.message):
+            expired_list.append(r)
+    return success_list, fail_list, expired_list
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+通知分发模块
+并发把签到结果发送到所有已配置的通知渠道（钉钉 / 飞书）
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any
+
+from notifier_common import ResultLike
+from dingtalk_notifier import send_checkin_notification as _send_dingtalk
+from feishu_notifier import send_checkin_notification as _send_feishu
+
+__all__ = ['dispatch_all']
+
+
+def dispatch_all(results: List[ResultLike], execution_time: Optional[str] = None) -> Dict[str, bool]:
+    """
+    并发发送签到通知到所有已配置的渠道
+
+    各渠道的发送只是阻塞在网络 I/O 上，用线程池并发可以把
+    每条 100-200ms 的往返延迟叠在一起，而不是串行累加。
+
+    Args:
+        results: 签到结果列表
+        execution_time: 执行时间（可选）
+
+    Returns:
+        {渠道名: 是否发送成功} 字典，未配置任何渠道时为空
+    """
+    channels = {}
+    if os.environ.get('DINGTALK_WEBHOOK'):
+        channels['钉钉'] = _send_dingtalk
+    if os.environ.get('FEISHU_WEBHOOK'):
+        channels['飞书'] = _send_feishu
+
+    if not channels:
+        print('[通知] 未配置任何通知渠道，跳过通知')
+        return {}
+
+    statuses: Dict[str, bool] = {}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {
+            pool.submit(send, results, execution_time): name
+            for name, send in channels.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                statuses[name] = future.result()
+            except Exception as e:
+                print(f'[通知] {name}发送异常: {e}')
+                statuses[name] = False
+    return statuses